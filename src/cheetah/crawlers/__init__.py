@@ -1,6 +1,6 @@
 import pathlib
 
-from typing import Any, Dict, Callable, Type
+from typing import Any, Dict, Callable, Tuple, Type
 
 try:
     from typing import TypedDict
@@ -77,3 +77,11 @@ facilities: Dict[str, TypeFacility] = {
         "crawler": LclsCrawler,
     },
 }
+
+
+detectors: Dict[Tuple[str, str, str], Dict[str, Any]] = {
+    (facility_name, instrument_name, detector_name): detector
+    for facility_name, facility in facilities.items()
+    for instrument_name, instrument in facility["instruments"].items()
+    for detector_name, detector in instrument["detectors"].items()
+}
@@ -3,13 +3,20 @@ import pathlib
 
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, TextIO, Dict,  Union, cast
+from typing import List, Dict, Union, cast
 
 try:
     from typing import TypedDict
 except:
     from typing_extensions import TypedDict
 
+_RAW_TO_PROC_TABLE: Dict[int, int] = str.maketrans("-", "_")
+
+
+def raw_id_to_proc_id(raw_id: str) -> str:
+    """ """
+    return raw_id.translate(_RAW_TO_PROC_TABLE)
+
 
 class TypeProcStatusItem(TypedDict):
     run_name: str
@@ -82,12 +89,14 @@ class Crawler(ABC):
 
     def raw_id_to_proc_id(self, raw_id: str) -> str:
         """ """
-        return raw_id.replace("-", "_")
+        return raw_id_to_proc_id(raw_id)
 
     def _scan_proc_directory(self) -> List[TypeProcStatusItem]:
         hdf5_status: List[TypeProcStatusItem] = []
         run_directory: pathlib.Path
         for run_directory in self._proc_directory.glob("*"):
+            if run_directory.name.startswith("."):
+                continue
             status_file: pathlib.Path = run_directory / "status.txt"
             run_name: str = run_directory.name
             split_items: List[str] = run_name.split("-")
@@ -135,13 +144,14 @@ class Crawler(ABC):
 
     def _parse_status_file(self, filename: pathlib.Path) -> Dict[str, str]:
         status: Dict[str, str] = {}
-        fh: TextIO
-        with open(filename, "r") as fh:
-            line: str
-            for line in fh:
-                line_items: List[str] = line.split(":")
-                if len(line_items) > 1:
-                    status[line_items[0].strip()] = ":".join(line_items[1:]).strip()
+        line: str
+        for line in filename.read_text().splitlines():
+            key: str
+            separator: str
+            value: str
+            key, separator, value = line.partition(":")
+            if separator:
+                status[key.strip()] = value.strip()
         return status
 
     def _scan_indexing_directory(self) -> None:
@@ -197,5 +207,4 @@ class Crawler(ABC):
                 csvfile, fieldnames=list(TypeTableRow.__annotations__.keys())
             )
             writer.writeheader()
-            for row in table_rows:
-                writer.writerow(row)
+            writer.writerows(table_rows)
@@ -1,4 +1,4 @@
-import pathlib
+import os
 
 from cheetah.crawlers.base import Crawler, TypeRawStatusItem
 from typing import Any, List, TextIO, Dict
@@ -14,15 +14,20 @@ class LclsCrawler(Crawler):
     def _scan_raw_directory(self) -> List[TypeRawStatusItem]:
         """ """
         status: Dict[str, str] = {}
-        filename: pathlib.Path
-        for filename in self._raw_directory.glob("*.xtc*"):
-            run_id: str = filename.name.split("-")[1]
-            if run_id not in status.keys():
-                status[run_id] = "Ready"
-            if filename.suffix == ".inprogress":
-                status[run_id] = "Copying"
-            elif filename.suffix == ".fromtape":
-                status[run_id] = "Restoring"
+        if not self._raw_directory.is_dir():
+            return []
+        entry: os.DirEntry[str]
+        with os.scandir(self._raw_directory) as entries:
+            for entry in entries:
+                if ".xtc" not in entry.name:
+                    continue
+                run_id: str = entry.name.split("-")[1]
+                if run_id not in status.keys():
+                    status[run_id] = "Ready"
+                if entry.name.endswith(".inprogress"):
+                    status[run_id] = "Copying"
+                elif entry.name.endswith(".fromtape"):
+                    status[run_id] = "Restoring"
 
         raw_status: List[TypeRawStatusItem] = []
         for run_id in status:
@@ -1,3 +1,4 @@
+import concurrent.futures
 import os
 import pathlib
 import shutil
@@ -9,7 +10,7 @@ try:
 except:
     from typing_extensions import TypedDict
 
-from cheetah.crawlers import facilities
+from cheetah.crawlers import detectors, facilities
 from cheetah.crawlers.base import Crawler
 from cheetah.process import CheetahProcess, TypeProcessingConfig
 
@@ -193,67 +194,69 @@ class CheetahExperiment:
         self._base_path = self._raw_directory.parent
         self._experiment_id = new_experiment_config["experiment_id"]
 
-        print(
-            f"Creating new Cheetah directory:\n{new_experiment_config['output_dir']}\n"
-        )
-        self._gui_directory = pathlib.Path(new_experiment_config["output_dir"]) / "gui"
-        self._gui_directory.mkdir(parents=True, exist_ok=False)
-
-        self._proc_directory = (
-            pathlib.Path(new_experiment_config["output_dir"]) / "hdf5"
+        output_directory: pathlib.Path = pathlib.Path(
+            new_experiment_config["output_dir"]
         )
-        self._proc_directory.mkdir(parents=True, exist_ok=False)
-
-        self._calib_directory = (
-            pathlib.Path(new_experiment_config["output_dir"]) / "calib"
-        )
-        self._calib_directory.mkdir(parents=True, exist_ok=False)
-
-        self._process_directory = (
-            pathlib.Path(new_experiment_config["output_dir"]) / "process"
+        resources_directory: pathlib.Path = pathlib.Path(
+            new_experiment_config["cheetah_resources"]
         )
-        self._process_directory.mkdir(parents=True, exist_ok=False)
+        print(f"Creating new Cheetah directory:\n{output_directory}\n")
+        self._gui_directory = output_directory / "gui"
+        self._proc_directory = output_directory / "hdf5"
+        self._calib_directory = output_directory / "calib"
+        self._process_directory = output_directory / "process"
+        output_directory.mkdir(parents=True, exist_ok=True)
+        directory: pathlib.Path
+        for directory in (
+            self._gui_directory,
+            self._proc_directory,
+            self._calib_directory,
+            self._process_directory,
+        ):
+            directory.mkdir(exist_ok=False)
 
         self._process_script = pathlib.Path("cheetah_process.py")
 
-        resources: Dict[str, Any] = facilities[new_experiment_config["facility"]][
-            "instruments"
-        ][new_experiment_config["instrument"]]["detectors"][
-            new_experiment_config["detector"]
+        resources: Dict[str, Any] = detectors[
+            (
+                new_experiment_config["facility"],
+                new_experiment_config["instrument"],
+                new_experiment_config["detector"],
+            )
+        ]
+        templates_directory: pathlib.Path = resources_directory / "templates"
+        sources: List[pathlib.Path] = [
+            resources_directory / resource
+            for resource in resources["calib_resources"].values()
+        ] + [
+            templates_directory / resources["om_config_template"],
+            templates_directory / resources["process_template"],
+        ]
+        destinations: List[pathlib.Path] = [
+            self._calib_directory / resource
+            for resource in resources["calib_resources"].values()
+        ] + [
+            self._process_directory / "template.yaml",
+            self._process_directory / "process_template.sh",
         ]
         print(
             f"Copying {new_experiment_config['detector']} geometry and mask to \n"
             f"{self._calib_directory}\n"
         )
-        resource: str
-        for resource in resources["calib_resources"].values():
-            shutil.copyfile(
-                pathlib.Path(new_experiment_config["cheetah_resources"]) / resource,
-                self._calib_directory / resource,
-            )
-        self._last_geometry = (
-            self._calib_directory / resources["calib_resources"]["geometry"]
-        )
-        self._last_mask = self._calib_directory / resources["calib_resources"]["mask"]
-
         print(
             f"Copying OM config and process script templates to \n"
             f"{self._process_directory}\n"
         )
-        om_template: str = resources["om_config_template"]
-        process_template: str = resources["process_template"]
-        shutil.copyfile(
-            pathlib.Path(new_experiment_config["cheetah_resources"])
-            / "templates"
-            / om_template,
-            self._process_directory / "template.yaml",
-        )
-        shutil.copyfile(
-            pathlib.Path(new_experiment_config["cheetah_resources"])
-            / "templates"
-            / process_template,
-            self._process_directory / "process_template.sh",
+        executor: concurrent.futures.ThreadPoolExecutor
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(sources)
+        ) as executor:
+            list(executor.map(shutil.copyfile, sources, destinations))
+
+        self._last_geometry = (
+            self._calib_directory / resources["calib_resources"]["geometry"]
         )
+        self._last_mask = self._calib_directory / resources["calib_resources"]["mask"]
 
         self._crawler_config_filename = self._gui_directory / "crawler.config"
 
@@ -301,6 +304,22 @@ class CheetahExperiment:
     def get_proc_directory(self) -> pathlib.Path:
         return self._proc_directory
 
+    def _update_last_processing_config(
+        self, processing_config: Union[TypeProcessingConfig, None]
+    ) -> TypeProcessingConfig:
+        if processing_config is None:
+            return self.get_last_processing_config()
+        self._last_process_config_filename = pathlib.Path(
+            processing_config["config_template"]
+        )
+        self._last_tag = processing_config["tag"]
+        self._last_geometry = pathlib.Path(processing_config["geometry"])
+        if processing_config["mask"]:
+            self._last_mask = pathlib.Path(processing_config["mask"])
+        else:
+            self._last_mask = None
+        return processing_config
+
     def process_run(
         self,
         run_id: str,
@@ -308,19 +327,7 @@ class CheetahExperiment:
         queue: Union[str, None] = None,
         n_processes: Union[int, None] = None,
     ) -> None:
-        if processing_config is None:
-            processing_config = self.get_last_processing_config()
-        else:
-            self._last_process_config_filename = pathlib.Path(
-                processing_config["config_template"]
-            )
-            self._last_tag = processing_config["tag"]
-            self._last_geometry = pathlib.Path(processing_config["geometry"])
-            if processing_config["mask"]:
-                self._last_mask = pathlib.Path(processing_config["mask"])
-            else:
-                self._last_mask = None
-
+        processing_config = self._update_last_processing_config(processing_config)
         self._cheetah_process.process_run(
             run_id,
             processing_config,
@@ -329,5 +336,21 @@ class CheetahExperiment:
         )
         self._write_crawler_config()
 
+    def process_runs(
+        self,
+        run_ids: List[str],
+        processing_config: Union[TypeProcessingConfig, None],
+        queue: Union[str, None] = None,
+        n_processes: Union[int, None] = None,
+    ) -> None:
+        processing_config = self._update_last_processing_config(processing_config)
+        self._cheetah_process.process_runs(
+            run_ids,
+            processing_config,
+            queue,
+            n_processes,
+        )
+        self._write_crawler_config()
+
     def start_crawler(self) -> Crawler:
         return self._crawler
@@ -109,8 +109,7 @@ class ProcessThread(QtCore.QThread):  # type: ignore
 
     def run(self) -> None:
         """ """
-        for run_id in self._runs:
-            self._experiment.process_run(run_id, self._config)
+        self._experiment.process_runs(self._runs, self._config)
 
 
 class CheetahGui(QtWidgets.QMainWindow):  # type: ignore
@@ -255,19 +254,23 @@ class CheetahGui(QtWidgets.QMainWindow):  # type: ignore
         cxi_files: List[str] = []
         dir: pathlib.Path
         for dir in selected_directories:
-            if len(list(dir.glob("*.cxi"))) > 0:
-                cxi_files.append(f"{dir}/*.cxi")
+            cxi_files.extend(str(file) for file in sorted(dir.glob("*.cxi")))
         if len(cxi_files) == 0:
             print("There's no .cxi files in the selected directories yet.")
             return
-        input_str: str = " ".join(cxi_files)
         geometry: str = self.experiment.get_last_processing_config()["geometry"]
-        viewer_command: str = (
-            f"cheetah_viewer.py {input_str} -d /entry_1/data_1/data "
-            f"-p /entry_1/result_1 -g {geometry}"
-        )
-        print(viewer_command)
-        subprocess.Popen(viewer_command, shell=True)
+        viewer_command: List[str] = [
+            "cheetah_viewer.py",
+            *cxi_files,
+            "-d",
+            "/entry_1/data_1/data",
+            "-p",
+            "/entry_1/result_1",
+            "-g",
+            geometry,
+        ]
+        print(" ".join(viewer_command))
+        subprocess.Popen(viewer_command)
 
     def _view_sum_hits(self) -> None:
         self._view_sums(1, "/data/data")
@@ -306,13 +309,17 @@ class CheetahGui(QtWidgets.QMainWindow):  # type: ignore
                 f"There's no class{sum_class} sum files in the selected directories yet."
             )
             return
-        input_str: str = " ".join(sum_files)
         geometry: str = self.experiment.get_last_processing_config()["geometry"]
-        viewer_command: str = (
-            f"cheetah_viewer.py {input_str} -d {hdf5_dataset} -g {geometry}"
-        )
-        print(viewer_command)
-        subprocess.Popen(viewer_command, shell=True)
+        viewer_command: List[str] = [
+            "cheetah_viewer.py",
+            *sum_files,
+            "-d",
+            hdf5_dataset,
+            "-g",
+            geometry,
+        ]
+        print(" ".join(viewer_command))
+        subprocess.Popen(viewer_command)
 
     def _enable_commands(self) -> None:
         self._ui.button_run_cheetah.setEnabled(True)
@@ -392,12 +399,19 @@ class CheetahGui(QtWidgets.QMainWindow):  # type: ignore
         self._table.setColumnCount(n_columns)
         self._table.updateGeometry()
 
+        # Fill the table with repaints suspended, styling each item before it is
+        # handed to the table.
+        self._table.setUpdatesEnabled(False)
+        default_color: Any = QtGui.QColor(255, 255, 255)
         column: int
         row: int
         name: str
         data: Dict[str, Any]
         for column, name in enumerate(self._table_column_names):
             if name in self._table_data[0].keys():
+                status_colors: Dict[str, Any] = (
+                    self._status_colors if name in ("Rawdata", "Cheetah") else {}
+                )
                 for row, data in enumerate(self._table_data):
                     value: str = data[name]
                     item: Any = QtWidgets.QTableWidgetItem()
@@ -405,18 +419,11 @@ class CheetahGui(QtWidgets.QMainWindow):  # type: ignore
                         item.setData(QtCore.Qt.DisplayRole, float(value))
                     except ValueError:
                         item.setText(value)
+                    item.setBackground(status_colors.get(value, default_color))
                     self._table.setItem(row, column, item)
 
-                    self._table.item(row, column).setBackground(
-                        QtGui.QColor(255, 255, 255)
-                    )
-                    if name in ("Rawdata", "Cheetah"):
-                        if value in self._status_colors.keys():
-                            self._table.item(row, column).setBackground(
-                                self._status_colors[value]
-                            )
-
         self._table.resizeRowsToContents()
+        self._table.setUpdatesEnabled(True)
         self._table.setSortingEnabled(True)
         print(f"Table refreshed at {datetime.now()}")
 
@@ -1,16 +1,23 @@
 import click  # type: ignore
+import concurrent.futures
+import functools
 import jinja2
+import os
 import pathlib
 import shutil
-import stat
 import subprocess
+import threading
+import time
 
-from typing import Callable, TextIO, Union
+from typing import Any, BinaryIO, Callable, Dict, List, Union, cast
 try:
-    from typing import Literal, TypedDict
+    from typing import TypedDict
 except:
-    from typing_extensions import Literal, TypedDict
+    from typing_extensions import TypedDict
 from cheetah.crawlers import facilities
+from cheetah.crawlers.base import raw_id_to_proc_id
+
+_STATUS_SUBMITTED: bytes = b"# Cheetah status\nStatus: Submitted\n"
 
 
 class TypeOmConfigTemplateData(TypedDict):
@@ -18,8 +25,8 @@ class TypeOmConfigTemplateData(TypedDict):
     output_dir: pathlib.Path
     experiment_id: str
     run_id: str
-    geometry_file: pathlib.Path
-    mask_file: Union[pathlib.Path, Literal["null"]]
+    geometry_file: str
+    mask_file: str
 
 
 class TypeProcessScriptTemplateData(TypedDict):
@@ -37,6 +44,30 @@ class TypeProcessingConfig(TypedDict):
     mask: str
 
 
+@functools.lru_cache(maxsize=None)
+def _jinja_environment() -> jinja2.Environment:
+    # The bytecode cache is optional: templates are compiled on every load if its
+    # directory cannot be set up.
+    bytecode_cache: Union[jinja2.BytecodeCache, None]
+    try:
+        # Cached bytecode does not depend on the environment options: change the
+        # cache file pattern whenever the options below are changed.
+        bytecode_cache = jinja2.FileSystemBytecodeCache(pattern="__cheetah_v1_%s.cache")
+    except (OSError, RuntimeError):
+        bytecode_cache = None
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader("/"),
+        bytecode_cache=bytecode_cache,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+    )
+
+
+def _load_template(filename: Union[str, pathlib.Path]) -> jinja2.Template:
+    return _jinja_environment().get_template(os.path.realpath(filename))
+
+
 class CheetahProcess:
     """
     See documentation of the `__init__` function.
@@ -54,92 +85,95 @@ class CheetahProcess:
         self._facility: str = facility
         self._experiment_id: str = experiment_id
         self._process_template_file: pathlib.Path = process_template
-        fh: TextIO
-        with open(self._process_template_file) as fh:
-            self._process_template: jinja2.Template = jinja2.Template(fh.read())
         self._raw_directory: pathlib.Path = raw_directory
         self._proc_directory: pathlib.Path = proc_directory
         self._prepare_om_source: Callable[
             [str, str, pathlib.Path, pathlib.Path], str
         ] = facilities[self._facility]["prepare_om_source"]
+        self._guess_batch_queue: Callable[[pathlib.Path], str] = facilities[
+            self._facility
+        ]["guess_batch_queue"]
+        threading.Thread(target=self._sweep_removed_directories, daemon=True).start()
 
-    def _raw_id_to_proc_id(self, raw_id: str) -> str:
-        """ """
-        return raw_id.replace("-", "_")
+    @property
+    def _process_template(self) -> jinja2.Template:
+        return _load_template(self._process_template_file)
+
+    def _write_template(
+        self,
+        filename: pathlib.Path,
+        template: jinja2.Template,
+        data: Any,
+        mode: int = 0o666,
+    ) -> None:
+        fh: BinaryIO
+        with open(
+            os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode), "wb"
+        ) as fh:
+            template.stream(data).dump(fh, encoding="utf-8")
+
+    def _remove_directory(self, directory: pathlib.Path) -> None:
+        trash_directory: pathlib.Path = directory.with_name(
+            f".{directory.name}.deleting-{os.getpid()}-{time.time_ns()}"
+        )
+        directory.rename(trash_directory)
+        threading.Thread(
+            target=shutil.rmtree, args=(trash_directory, True), daemon=True
+        ).start()
+
+    def _sweep_removed_directories(self) -> None:
+        # Finish deleting directories left behind by an interrupted session
+        trash_directory: pathlib.Path
+        for trash_directory in self._proc_directory.glob(".*.deleting-*"):
+            shutil.rmtree(trash_directory, True)
 
     def _write_process_config_file(
         self, output_directory: pathlib.Path, config: TypeProcessingConfig
     ) -> None:
-        fh: TextIO
-        with open(output_directory / "process_config.txt", "w") as fh:
-            for key, value in config.items():
-                fh.write(f"{key}: {value}\n")
+        (output_directory / "process_config.txt").write_bytes(
+            "".join(f"{key}: {value}\n" for key, value in config.items()).encode()
+        )
 
     def _write_status_file(self, output_directory: pathlib.Path) -> None:
-        fh: TextIO
-        with open(output_directory / "status.txt", "w") as fh:
-            fh.write("# Cheetah status\n")
-            fh.write("Status: Submitted\n")
+        (output_directory / "status.txt").write_bytes(_STATUS_SUBMITTED)
 
-    def process_run(
+    def _prepare_run_directory(
         self,
         run_id: str,
-        config: TypeProcessingConfig,
-        queue: Union[str, None] = None,
-        n_processes: Union[int, None] = None,
-    ) -> None:
-        """ """
-        om_config_template_file: pathlib.Path = pathlib.Path(config["config_template"])
-        tag: str = config["tag"]
-        geometry_file: pathlib.Path = pathlib.Path(config["geometry"])
-        if config["mask"]:
-            mask_file: Union[pathlib.Path, Literal["null"]] = pathlib.Path(
-                config["mask"]
-            )
-        else:
-            mask_file = "null"
-
-        proc_id: str = self._raw_id_to_proc_id(run_id)
+        tag: str,
+        om_config_template: jinja2.Template,
+        om_config_base_data: Dict[str, Any],
+        process_template: jinja2.Template,
+        queue: str,
+        n_processes: int,
+        messages: List[str],
+    ) -> pathlib.Path:
+        proc_id: str = raw_id_to_proc_id(run_id)
         output_directory_name: str = f"{proc_id}-{tag}"
         output_directory: pathlib.Path = self._proc_directory / output_directory_name
 
         if output_directory.is_dir():
-            print(
+            messages.append(
                 f"Moving to existing data directory {output_directory}\n"
                 f"Deleting previous files"
             )
-            shutil.rmtree(output_directory)
+            self._remove_directory(output_directory)
         else:
-            print(f"Creating hdf5 data directory {output_directory}")
+            messages.append(f"Creating hdf5 data directory {output_directory}")
         output_directory.mkdir()
 
-        print(f"Copying configuration file: {om_config_template_file}")
+        messages.append(f"Copying configuration file: {om_config_template.filename}")
         om_config_file: pathlib.Path = output_directory / "monitor.yaml"
-
-        fh: TextIO
-        with open(om_config_template_file) as fh:
-            om_config_template: jinja2.Template = jinja2.Template(fh.read())
-
-        om_config_data: TypeOmConfigTemplateData = {
-            "psana_calib_dir": self._raw_directory.parent / "calib",
-            "output_dir": output_directory,
-            "experiment_id": self._experiment_id,
-            "run_id": proc_id,
-            "geometry_file": geometry_file,
-            "mask_file": mask_file,
-        }
-        with open(om_config_file, "w") as fh:
-            fh.write(om_config_template.render(om_config_data))
+        om_config_data: TypeOmConfigTemplateData = cast(
+            TypeOmConfigTemplateData,
+            {**om_config_base_data, "output_dir": output_directory, "run_id": proc_id},
+        )
+        self._write_template(om_config_file, om_config_template, om_config_data)
 
         process_script: pathlib.Path = output_directory / "process.sh"
         om_source: str = self._prepare_om_source(
             run_id, self._experiment_id, self._raw_directory, output_directory
         )
-
-        if not queue:
-            queue = facilities[self._facility]["guess_batch_queue"](self._raw_directory)
-        if not n_processes:
-            n_processes = 12
         process_script_data: TypeProcessScriptTemplateData = {
             "queue": queue,
             "job_name": output_directory_name,
@@ -147,14 +181,121 @@ class CheetahProcess:
             "om_source": om_source,
             "om_config": om_config_file,
         }
-        with open(process_script, "w") as fh:
-            fh.write(self._process_template.render(process_script_data))
+        self._write_template(
+            process_script, process_template, process_script_data, 0o755
+        )
+        return output_directory
 
-        process_script.chmod(process_script.stat().st_mode | stat.S_IEXEC)
-        subprocess.run(f"{process_script}", cwd=output_directory)
+    def _submit_run(
+        self,
+        output_directory: pathlib.Path,
+        config: TypeProcessingConfig,
+        messages: List[str],
+    ) -> None:
+        # The submission output is kept in the run directory and reported with the
+        # run's other messages, instead of several scripts sharing stdout at once.
+        submit_output: bytes = subprocess.run(
+            [str(output_directory / "process.sh")],
+            cwd=output_directory,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            check=False,
+        ).stdout
+        (output_directory / "submit.log").write_bytes(submit_output)
+        if submit_output:
+            messages.append(submit_output.decode(errors="replace").rstrip("\n"))
         self._write_status_file(output_directory)
         self._write_process_config_file(output_directory, config)
 
+    def _prepare_and_submit_run(
+        self,
+        run_id: str,
+        config: TypeProcessingConfig,
+        om_config_template: jinja2.Template,
+        om_config_base_data: Dict[str, Any],
+        process_template: jinja2.Template,
+        queue: str,
+        n_processes: int,
+        messages: List[str],
+    ) -> None:
+        output_directory: pathlib.Path = self._prepare_run_directory(
+            run_id,
+            config["tag"],
+            om_config_template,
+            om_config_base_data,
+            process_template,
+            queue,
+            n_processes,
+            messages,
+        )
+        self._submit_run(output_directory, config, messages)
+
+    def process_run(
+        self,
+        run_id: str,
+        config: TypeProcessingConfig,
+        queue: Union[str, None] = None,
+        n_processes: Union[int, None] = None,
+    ) -> None:
+        """ """
+        self.process_runs([run_id], config, queue, n_processes)
+
+    def process_runs(
+        self,
+        run_ids: List[str],
+        config: TypeProcessingConfig,
+        queue: Union[str, None] = None,
+        n_processes: Union[int, None] = None,
+    ) -> None:
+        """ """
+        om_config_template: jinja2.Template = _load_template(config["config_template"])
+        om_config_base_data: Dict[str, Any] = {
+            "psana_calib_dir": self._raw_directory.parent / "calib",
+            "experiment_id": self._experiment_id,
+            "geometry_file": config["geometry"],
+            "mask_file": config["mask"] or "null",
+        }
+        process_template: jinja2.Template = self._process_template
+        if not queue:
+            queue = self._guess_batch_queue(self._raw_directory)
+        if not n_processes:
+            n_processes = 12
+
+        # Each run is prepared and submitted by its own task, so that a failure in
+        # one run does not prevent the others from being submitted.
+        executor: concurrent.futures.ThreadPoolExecutor
+        futures: List[concurrent.futures.Future[None]] = []
+        run_messages: List[List[str]] = [[] for _ in run_ids]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+            run_id: str
+            messages: List[str]
+            for run_id, messages in zip(run_ids, run_messages):
+                futures.append(
+                    executor.submit(
+                        self._prepare_and_submit_run,
+                        run_id,
+                        config,
+                        om_config_template,
+                        om_config_base_data,
+                        process_template,
+                        queue,
+                        n_processes,
+                        messages,
+                    )
+                )
+
+        failed_run_ids: List[str] = []
+        future: concurrent.futures.Future[None]
+        for run_id, future, messages in zip(run_ids, futures, run_messages):
+            if messages:
+                print("\n".join(messages))
+            error: Union[BaseException, None] = future.exception()
+            if error is not None:
+                print(f"Run {run_id} could not be submitted: {error}")
+                failed_run_ids.append(run_id)
+        if failed_run_ids:
+            print(f"Failed to submit runs: {', '.join(failed_run_ids)}")
+
 
 @click.command()  # type: ignore
 def main() -> None:
@@ -10,22 +10,11 @@ from PyQt5 import QtGui, QtCore, QtWidgets, uic  # type: ignore
 import pyqtgraph  # type: ignore
 from random import randrange
 from scipy import constants  # type: ignore
-from typing import Any, List, Dict, TextIO, Union, Tuple, cast
-try:
-    from typing import TypedDict
-except:
-    from typing_extensions import TypedDict
+from typing import Any, List, Dict, TextIO, Union, Tuple
 
 from cheetah import __file__ as cheetah_src_path
 
 
-class TypeEvent(TypedDict):
-    """ """
-
-    filename: str
-    event: int
-
-
 class Viewer(QtWidgets.QMainWindow):  # type: ignore
     """
     See documentation of the `__init__` function.
@@ -69,38 +58,41 @@ class Viewer(QtWidgets.QMainWindow):  # type: ignore
                     )
                     self._ui.show_mask_cb.setEnabled(False)
                 else:
-                    mask: numpy.typing.NDArray[Any] = (
-                        1 - mask_file[self._mask_hdf5_path][()]
-                    )
-                    mask_img: numpy.typing.NDArray[Any] = numpy.zeros(
-                        self._visual_img_shape, dtype=mask.dtype
+                    # Scatter the bad pixels (zeros in the mask file) straight into
+                    # an image laid out in display (transposed) order.
+                    self._mask: numpy.typing.NDArray[numpy.uint8] = numpy.zeros(
+                        self._visual_img_shape[::-1], dtype=numpy.uint8
                     )
-                    mask_img[
-                        self._visual_pixelmap_y, self._visual_pixelmap_x
-                    ] = mask.ravel()
-                    self._mask: numpy.typing.NDArray[Any] = numpy.zeros(
-                        shape=mask_img.T.shape + (4,)
-                    )
-                    self._mask[:, :, 2] = mask_img.T
-                    self._mask[:, :, 3] = mask_img.T
+                    self._mask[
+                        self._visual_pixelmap_x, self._visual_pixelmap_y
+                    ] = mask_file[self._mask_hdf5_path][()].ravel() == 0
         else:
             self._ui.show_mask_cb.setEnabled(False)
 
         self._input_files: Dict[str, Any] = {}
-        self._events: List[TypeEvent] = []
+        self._event_filenames: List[str] = list(input_files)
+        file_indices: List[numpy.typing.NDArray[numpy.int32]] = []
+        event_indices: List[numpy.typing.NDArray[numpy.int64]] = []
+        file_index: int
         filename: str
-        for filename in input_files:
+        for file_index, filename in enumerate(self._event_filenames):
             self._input_files[filename] = h5py.File(filename, "r")
             data = self._input_files[filename][self._hdf5_data_path]
             if len(data.shape) == 2:
-                self._events.append({"filename": filename, "event": -1})
+                event_indices.append(numpy.array([-1], dtype=numpy.int64))
             else:
-                i: int
-                self._events.extend(
-                    [{"filename": filename, "event": i} for i in range(data.shape[0])]
-                )
+                event_indices.append(numpy.arange(data.shape[0], dtype=numpy.int64))
+            file_indices.append(
+                numpy.full(len(event_indices[-1]), file_index, dtype=numpy.int32)
+            )
+        self._event_file_indices: numpy.typing.NDArray[numpy.int32] = numpy.concatenate(
+            file_indices
+        )
+        self._event_indices: numpy.typing.NDArray[numpy.int64] = numpy.concatenate(
+            event_indices
+        )
 
-        self._num_events = len(self._events)
+        self._num_events = len(self._event_indices)
         self._current_event = 0
         self._hdf5_peaks_path = hdf5_peaks_path
         if not self._hdf5_peaks_path:
@@ -226,18 +218,14 @@ class Viewer(QtWidgets.QMainWindow):  # type: ignore
         self._visual_img_shape: Tuple[int, int] = (y_minimum, x_minimum)
         self._img_center_x: int = int(self._visual_img_shape[1] / 2)
         self._img_center_y: int = int(self._visual_img_shape[0] / 2)
-        self._visual_pixelmap_x: numpy.typing.NDArray[numpy.int32] = cast(
-            numpy.typing.NDArray[numpy.int32],
-            numpy.array(self._pixelmaps["x"], dtype=numpy.int32)
-            + self._visual_img_shape[1] // 2
-            - 1,
-        ).flatten()
-        self._visual_pixelmap_y: numpy.typing.NDArray[numpy.int32] = cast(
-            numpy.typing.NDArray[numpy.int32],
-            numpy.array(self._pixelmaps["y"], dtype=numpy.int32)
-            + self._visual_img_shape[0] // 2
-            - 1,
-        ).flatten()
+        self._visual_pixelmap_x: numpy.typing.NDArray[numpy.int32] = numpy.array(
+            self._pixelmaps["x"], dtype=numpy.int32
+        ).ravel()
+        self._visual_pixelmap_x += self._visual_img_shape[1] // 2 - 1
+        self._visual_pixelmap_y: numpy.typing.NDArray[numpy.int32] = numpy.array(
+            self._pixelmaps["y"], dtype=numpy.int32
+        ).ravel()
+        self._visual_pixelmap_y += self._visual_img_shape[0] // 2 - 1
 
     def _update_resolution_rings_status(self) -> None:
         new_state = self._resolution_rings_check_box.isChecked()
@@ -284,8 +272,10 @@ class Viewer(QtWidgets.QMainWindow):  # type: ignore
             return
 
         try:
-            filename: str = self._events[self._current_event]["filename"]
-            indx: int = self._events[self._current_event]["event"]
+            filename: str = self._event_filenames[
+                self._event_file_indices[self._current_event]
+            ]
+            indx: int = int(self._event_indices[self._current_event])
             if self._clen_from:
                 if indx == -1:
                     detector_distance: float = self._input_files[filename][
@@ -309,17 +299,21 @@ class Viewer(QtWidgets.QMainWindow):  # type: ignore
             else:
                 photon_energy = self._photon_energy
             lambda_: float = constants.h * constants.c / (photon_energy * constants.e)
-            resolution_rings_in_pix: List[float] = [1.0]
-            resolution_rings_in_pix.extend(
-                [
+            resolution_rings_in_pix: numpy.typing.NDArray[numpy.float64] = numpy.empty(
+                len(self._resolution_rings_in_a) + 1
+            )
+            resolution_rings_in_pix[0] = 1.0
+            resolution_rings_in_pix[1:] = (
+                2.0
+                * self._pixel_size
+                * (detector_distance * 1e-3 + self._coffset)
+                * numpy.tan(
                     2.0
-                    * self._pixel_size
-                    * (detector_distance * 1e-3 + self._coffset)
-                    * numpy.tan(
-                        2.0 * numpy.arcsin(lambda_ / (2.0 * resolution * 1e-10))
+                    * numpy.arcsin(
+                        lambda_
+                        / (2.0 * numpy.array(self._resolution_rings_in_a) * 1e-10)
                     )
-                    for resolution in self._resolution_rings_in_a
-                ]
+                )
             )
         except (TypeError, KeyError):
             print(
@@ -329,8 +323,8 @@ class Viewer(QtWidgets.QMainWindow):  # type: ignore
             self._resolution_rings_check_box.setChecked(False)
         else:
             self._resolution_rings_canvas.setData(
-                [self._img_center_x] * len(resolution_rings_in_pix),
-                [self._img_center_y] * len(resolution_rings_in_pix),
+                numpy.full(len(resolution_rings_in_pix), self._img_center_x),
+                numpy.full(len(resolution_rings_in_pix), self._img_center_y),
                 symbol="o",
                 size=resolution_rings_in_pix,
                 pen=self._resolution_rings_pen,
@@ -338,13 +332,15 @@ class Viewer(QtWidgets.QMainWindow):  # type: ignore
                 pxMode=False,
             )
 
-            index: int
+            text_positions_x: numpy.typing.NDArray[numpy.float64] = (
+                self._img_center_x + resolution_rings_in_pix[1:] / 2.0
+            )
             item: Any
-            for index, item in enumerate(self._resolution_rings_textitems):
-                item.setPos(
-                    (self._img_center_x + resolution_rings_in_pix[index + 1] / 2.0),
-                    self._img_center_y,
-                )
+            position_x: float
+            for item, position_x in zip(
+                self._resolution_rings_textitems, text_positions_x
+            ):
+                item.setPos(position_x, self._img_center_y)
 
     def _hist_range_changed(self) -> None:
         self._levels_range = self._image_hist.getLevels()
@@ -362,8 +358,12 @@ class Viewer(QtWidgets.QMainWindow):  # type: ignore
                 float(self._ui.min_range_le.text()),
             )
             self._ui.max_range_le.setText(self._ui.min_range_le.text())
+        # Only the levels change here: skip the frame reload that unchecking
+        # auto-range would otherwise trigger.
+        self._ui.auto_range_cb.blockSignals(True)
         self._ui.auto_range_cb.setChecked(False)
-        self._update_image_and_peaks()
+        self._ui.auto_range_cb.blockSignals(False)
+        self._image_view.setLevels(*self._levels_range)
 
     def _mouse_moved(self, pos: Any) -> None:
         data: numpy.typing.NDArray[Any] = self._image_view.image
@@ -413,8 +413,10 @@ class Viewer(QtWidgets.QMainWindow):  # type: ignore
 
     def _update_image_and_peaks(self) -> None:
         # Updates the image and Bragg peaks shown by the viewer.
-        filename: str = self._events[self._current_event]["filename"]
-        indx: int = self._events[self._current_event]["event"]
+        filename: str = self._event_filenames[
+            self._event_file_indices[self._current_event]
+        ]
+        indx: int = int(self._event_indices[self._current_event])
         if indx == -1:
             data: numpy.typing.NDArray[Any] = self._input_files[filename][
                 self._hdf5_data_path
@@ -424,16 +426,17 @@ class Viewer(QtWidgets.QMainWindow):  # type: ignore
 
         self._frame_data_img[
             self._visual_pixelmap_y, self._visual_pixelmap_x
-        ] = data.ravel().astype(self._frame_data_img.dtype)
+        ] = data.ravel()
 
         if self._ui.auto_range_cb.isChecked():
-            values = data.flatten()
-            values.sort()
-            nvalues: int = len(values)
-            self._levels_range = (
-                values[nvalues // 100],
-                values[nvalues - nvalues // 100],
-            )
+            nvalues: int = data.size
+            low: int = nvalues // 100
+            high: int = nvalues - nvalues // 100
+            # The frame has already been copied into the visual image and data is
+            # a freshly read array: select the percentiles in place.
+            values: numpy.typing.NDArray[Any] = data.ravel()
+            values.partition((low, high))
+            self._levels_range = (values[low], values[high])
 
         self._image_view.setImage(
             self._frame_data_img.T,
@@ -447,49 +450,52 @@ class Viewer(QtWidgets.QMainWindow):  # type: ignore
         self.statusBar().showMessage("Showing {0}, event {1}".format(filename, indx))
 
     def _update_mask_image(self) -> None:
-        if self._ui.show_mask_cb.isChecked():
+        # The mask never changes: upload it once, then only toggle its visibility.
+        if self._ui.show_mask_cb.isChecked() and self._mask_image.image is None:
+            # Masked pixels are drawn opaque blue through a two-entry lookup table.
             self._mask_image.setImage(
-                self._mask, compositionMode=QtGui.QPainter.CompositionMode_SourceOver
+                self._mask,
+                lut=numpy.array([[0, 0, 0, 0], [0, 0, 255, 255]], dtype=numpy.uint8),
+                levels=(0, 1),
+                compositionMode=QtGui.QPainter.CompositionMode_SourceOver,
             )
-        else:
-            self._mask_image.clear()
+        self._mask_image.setVisible(self._ui.show_mask_cb.isChecked())
 
     def _update_peaks(self) -> None:
         # Updates the Bragg peaks shown by the viewer.
-        peak_list_y_in_frame: List[float] = []
-        peak_list_x_in_frame: List[float] = []
+        peak_x_in_frame: numpy.typing.NDArray[numpy.int32] = numpy.empty(
+            0, dtype=numpy.int32
+        )
+        peak_y_in_frame: numpy.typing.NDArray[numpy.int32] = numpy.empty(
+            0, dtype=numpy.int32
+        )
         if self._ui.show_peaks_cb.isChecked():
-            filename: str = self._events[self._current_event]["filename"]
-            indx: int = self._events[self._current_event]["event"]
+            filename: str = self._event_filenames[
+                self._event_file_indices[self._current_event]
+            ]
+            indx: int = int(self._event_indices[self._current_event])
             if self._hdf5_peaks_path not in self._input_files[filename]:
                 print(f"Peaks dataset {self._hdf5_peaks_path} not found in {filename}")
                 return
-            num_peaks: int = self._input_files[filename][self._hdf5_peaks_path][
-                "nPeaks"
-            ][indx]
-            peak_fs: float
-            peak_ss: float
-            for peak_fs, peak_ss in zip(
-                self._input_files[filename][self._hdf5_peaks_path]["peakXPosRaw"][indx][
-                    :num_peaks
-                ],
-                self._input_files[filename][self._hdf5_peaks_path]["peakYPosRaw"][indx][
-                    :num_peaks
-                ],
-            ):
-                peak_index_in_slab: int = int(round(peak_ss)) * self._data_shape[
-                    1
-                ] + int(round(peak_fs))
-                y_in_frame: float = self._visual_pixelmap_y[peak_index_in_slab]
-                x_in_frame: float = self._visual_pixelmap_x[peak_index_in_slab]
-                peak_list_x_in_frame.append(y_in_frame)
-                peak_list_y_in_frame.append(x_in_frame)
+            peaks: Any = self._input_files[filename][self._hdf5_peaks_path]
+            num_peaks: int = peaks["nPeaks"][indx]
+            peak_fs: numpy.typing.NDArray[numpy.int64] = numpy.rint(
+                peaks["peakXPosRaw"][indx][:num_peaks]
+            ).astype(numpy.int64)
+            peak_ss: numpy.typing.NDArray[numpy.int64] = numpy.rint(
+                peaks["peakYPosRaw"][indx][:num_peaks]
+            ).astype(numpy.int64)
+            peak_indices_in_slab: numpy.typing.NDArray[numpy.int64] = (
+                peak_ss * self._data_shape[1] + peak_fs
+            )
+            peak_x_in_frame = self._visual_pixelmap_x[peak_indices_in_slab]
+            peak_y_in_frame = self._visual_pixelmap_y[peak_indices_in_slab]
         self._peak_canvas.setData(
-            x=peak_list_y_in_frame,
-            y=peak_list_x_in_frame,
+            x=peak_x_in_frame,
+            y=peak_y_in_frame,
             symbol="o",
             brush=(255, 255, 255, 0),
-            size=[5] * len(peak_list_x_in_frame),
+            size=5,
             pen=self._ring_pen,
             pxMode=False,
         )